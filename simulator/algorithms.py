@@ -25,8 +25,28 @@ boolean
     this moment. In that case, the other two values are irrelevant.
 Job
     the Job object describing the job chosen to be executed next.
+
+
+The queue of jobs is a JobQueue object (see simulator.queue): besides
+being a list, it keeps parallel NumPy arrays with the nodes,
+requested_run_time, submit_time and jobID of the queued jobs, plus a
+'valid' mask. A scheduler may use them to choose a job without looping
+over the queue. For instance, the queued job that requests the most
+nodes among the ones that fit in the available nodes is:
+
+    import numpy as np
+
+    fits = jobs.valid & (jobs.nodes <= cluster.available_nodes)
+    if fits.any():
+        slot = np.argmax(np.where(fits, jobs.nodes, -1))
+        job = jobs.job_at(slot)
+
+Ties are broken by the smallest slot, which is also the earliest
+submitted job.
 """
 
+from simulator.lookahead import Snapshot
+
 
 def fcfs(jobs, cluster, clock):
     """First Come, First Served scheduler.
@@ -145,3 +165,69 @@ def fcfs_easy(jobs, cluster, clock):
     #    first job (i.e., its requested_run_time should be smaller
     #    than the predicted start of the first job minus the current clock
     #    or it falls in the extra nodes available).
+
+
+# Parameters of the lookahead scheduler
+LOOKAHEAD_WINDOW = 16  # number of jobs from the head of the queue
+LOOKAHEAD_HORIZON = 24 * 3600  # seconds simulated ahead
+LOOKAHEAD_MAX_STEPS = 4096  # job releases simulated per decision
+
+
+def lookahead(jobs, cluster, clock):
+    """Lookahead scheduler.
+
+    Parameters
+    ----------
+    jobs : list of Job objects
+        Queue of available jobs
+    cluster : Cluster object
+        Cluster containing the nodes required by jobs
+    clock : int
+        Current clock. Useful for debugging and advanced functions
+
+    Returns
+    -------
+    bool, Job
+        True if a job can be scheduled + the job to be scheduled
+
+    Notes
+    -----
+    This scheduler considers the first LOOKAHEAD_WINDOW jobs of the
+    queue and a few orders to start them: arrival order, shortest
+    requested run time first, fewest nodes first, and each job that
+    fits right now followed by the others in arrival order.
+    Each order is simulated LOOKAHEAD_HORIZON seconds ahead, using the
+    requested run times (see simulator.lookahead), and the order with
+    the smallest total wait wins. If its first job fits, it is
+    scheduled; otherwise we wait.
+    The cost of a decision is bounded by LOOKAHEAD_MAX_STEPS: the
+    orders (at most 3 + LOOKAHEAD_WINDOW) are simulated in the order
+    above until that many job releases were simulated in total, and
+    the orders left are not considered. As the budget counts work
+    instead of time, the decisions do not depend on the speed of the
+    machine, and the results can be cached.
+    """
+    window = jobs[:LOOKAHEAD_WINDOW]
+    fitting = [job for job in window if job.nodes <= cluster.available_nodes]
+    if len(fitting) == 0:  # whatever the order, we have to wait
+        return (False, None)
+    if len(window) == 1:  # only one order to consider
+        return (True, window[0])
+
+    snapshot = Snapshot(window, cluster, clock)
+    orders = [window,
+              sorted(window, key=lambda job: (job.requested_run_time,
+                                              job.jobID)),
+              sorted(window, key=lambda job: (job.nodes, job.jobID))]
+    for job in fitting:
+        if job is not window[0]:
+            orders.append([job] + [other for other in window
+                                   if other is not job])
+    best = snapshot.best_order(orders, LOOKAHEAD_HORIZON,
+                               LOOKAHEAD_MAX_STEPS)
+
+    nextjob = best[0]
+    if cluster.available_nodes >= nextjob.nodes:
+        return (True, nextjob)
+    else:
+        return (False, None)
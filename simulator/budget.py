@@ -0,0 +1,160 @@
+"""Budget module.
+
+Keeps long simulations within a wall-time and memory budget, and
+summarizes per-job values in constant memory when a simulation has to
+reduce its footprint.
+"""
+
+import os
+import random
+import sys
+import time
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def current_memory():
+    """Returns the memory used by this process, in bytes.
+
+    Notes
+    -----
+    This is the resident set size when /proc is available (Linux).
+    Otherwise it is the peak resident set size, or 0 if the platform
+    offers no way to measure it.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as infile:
+            pages = int(infile.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Budget:
+    """Wall-time and memory limits of a simulation.
+
+    Attributes
+    ----------
+    time_budget : float or None
+        Seconds the simulation may run (None for no limit)
+    memory_budget : int or None
+        Bytes the process may use (None for no limit)
+    start : float
+        time.perf_counter() when the simulation started
+    """
+    def __init__(self, time_budget=None, memory_budget=None):
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.start = time.perf_counter()
+
+    def is_limited(self):
+        """Returns True if there is any limit to check."""
+        return (self.time_budget is not None or
+                self.memory_budget is not None)
+
+    def used(self):
+        """Returns the fraction used of the tightest budget.
+
+        Returns
+        -------
+        float
+            0.0 if there are no limits, above 1.0 once a limit is
+            exceeded
+        """
+        fraction = 0.0
+        if self.time_budget is not None:
+            elapsed = time.perf_counter() - self.start
+            fraction = elapsed / self.time_budget
+        if self.memory_budget is not None:
+            fraction = max(fraction,
+                           current_memory() / self.memory_budget)
+        return fraction
+
+
+class Summary:
+    """Constant-memory summary of a series of values.
+
+    Keeps the count, sum, minimum and maximum of the values, plus a
+    uniform random sample of them (reservoir sampling) to estimate the
+    median.
+
+    Attributes
+    ----------
+    count : int
+        Number of values added
+    total : int
+        Sum of the values
+    minimum, maximum : int or None
+        Smallest and largest values (None while the series is empty)
+    sample : list
+        At most SAMPLE_SIZE values chosen uniformly among the added ones
+    """
+    SAMPLE_SIZE = 10000
+
+    def __init__(self, values=()):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.sample = []
+        self._random = random.Random(0)  # reproducible samples
+        for value in values:
+            self.append(value)
+
+    def append(self, value):
+        """Adds a value to the series."""
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if len(self.sample) < self.SAMPLE_SIZE:
+            self.sample.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self.SAMPLE_SIZE:
+                self.sample[slot] = value
+
+    def __len__(self):
+        return self.count
+
+
+def summarize(values):
+    """Describes a series of values.
+
+    Parameters
+    ----------
+    values : list or Summary
+        the series
+
+    Returns
+    -------
+    dict
+        min, max, mean, median and total of the values (None for an
+        empty series). With a Summary, the median is estimated from its
+        sample.
+    """
+    if len(values) == 0:
+        return {'min': None, 'max': None, 'mean': None, 'median': None,
+                'total': 0}
+    if isinstance(values, Summary):
+        return {'min': int(values.minimum),
+                'max': int(values.maximum),
+                'mean': values.total / values.count,
+                'median': float(np.median(values.sample)),
+                'total': int(values.total)}
+    return {'min': int(np.min(values)),
+            'max': int(np.max(values)),
+            'mean': float(np.mean(values)),
+            'median': float(np.median(values)),
+            'total': int(np.sum(values))}
@@ -0,0 +1,270 @@
+"""Simulation result cache module.
+
+Memoizes whole simulations on disk, so configurations that were
+already simulated do not replay the trace again.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import types
+from simulator.engine import Engine, print_statistics
+from simulator.trace import file_digest, with_namespaces
+import simulator.algorithms as algorithms
+
+# Changes whenever the format of the cached results or the behavior of
+# the engine changes, invalidating every result stored before.
+CACHE_VERSION = 5
+
+
+def global_names(code):
+    """Returns the global names read by a code object, including the
+    ones read by the lambdas, comprehensions and inner functions it
+    contains."""
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            names |= global_names(constant)
+    return names
+
+
+def scheduler_source(scheduler):
+    """Returns the code a scheduling function depends on.
+
+    Besides the source of the function itself, this includes the source
+    of the functions and classes from the simulator package that it
+    uses (and, recursively, the ones they use), and the values of the
+    module constants they read. Names used inside lambdas,
+    comprehensions and inner functions count as used.
+
+    Parameters
+    ----------
+    scheduler : function from algorithms
+        the scheduling function
+
+    Returns
+    -------
+    string
+        the source code, ready to be hashed
+    """
+    parts = []
+    seen = set()
+    pending = [scheduler]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        parts.append(inspect.getsource(item))
+        if inspect.isclass(item):
+            functions = [member for _, member in
+                         sorted(vars(item).items())
+                         if inspect.isfunction(member)]
+        else:
+            functions = [item]
+        for function in functions:
+            for name in sorted(global_names(function.__code__)):
+                if name not in function.__globals__:
+                    continue
+                value = function.__globals__[name]
+                if isinstance(value, (int, float, str, bool, tuple)):
+                    parts.append(f'{function.__module__}.{name}' +
+                                 f' = {value!r}')
+                elif ((inspect.isfunction(value) or
+                       inspect.isclass(value)) and
+                      value.__module__.startswith('simulator')):
+                    pending.append(value)
+    return '\n'.join(parts)
+
+
+class ResultCache:
+    """Size-bounded, least recently used, on-disk cache of simulations.
+
+    Attributes
+    ----------
+    directory : string
+        Directory holding one JSON file per cached simulation
+    max_bytes : int
+        Maximum total size of the cached files
+    hits : int
+        Number of simulations answered from the cache
+    misses : int
+        Number of simulations that had to be run
+
+    Notes
+    -----
+    A simulation is identified by the contents of the input file, the
+    source code of the scheduling function (with the simulator
+    functions, classes and constants it uses, see scheduler_source)
+    and the parameters of the simulation. Editing the scheduler or its
+    helpers invalidates its results, but changes reached only through
+    attributes of other modules (for instance, code in the engine) are
+    NOT detected: bump CACHE_VERSION in that case.
+    """
+    def __init__(self, directory='.simulation_cache',
+                 max_bytes=64 * 1024 * 1024):
+        """Creates the cache.
+
+        Parameters
+        ----------
+        directory : string [default=.simulation_cache]
+            Directory where results are stored (created if needed)
+        max_bytes : int [default=64 MiB]
+            Maximum total size of the stored results
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._digests = dict()  # {input file: (mtime, size, digest)}
+        os.makedirs(directory, exist_ok=True)
+
+    def _trace_digest(self, input_file):
+        """Hashes an input file, reusing the digest while the file is
+        unchanged."""
+        info = os.stat(input_file)
+        stamp = (info.st_mtime_ns, info.st_size)
+        cached = self._digests.get(input_file)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, file_digest(input_file))
+            self._digests[input_file] = cached
+        return cached[1]
+
+    def _describe(self, input_file):
+        """Describes the input of a simulation as Engine sees it: the
+        digests of the logs' contents plus their offsets and
+        namespaces, whether they are given by name, as a Trace or as a
+        Source, alone or in a list."""
+        if not isinstance(input_file, list):
+            input_file = [input_file]
+        return [source.describe(self._trace_digest)
+                for source in with_namespaces(input_file)]
+
+    def key(self, algorithm_name, nodes, task_limit, input_file,
+            record_jobs=False):
+        """Returns the key identifying a simulation.
+
+        Parameters
+        ----------
+        algorithm_name : string
+            Name of the scheduling algorithm to use
+        nodes : int
+            Number of nodes in the cluster
+        task_limit : int
+            Number of tasks to read from the input file
+        input_file : string or list
+            Input file(s) of the simulation, as given to Engine
+        record_jobs : bool [default=False]
+            True if the result includes the table of jobs
+
+        Returns
+        -------
+        string or None
+            the key, or None if the algorithm does not exist
+        """
+        scheduler = getattr(algorithms, algorithm_name, None)
+        if scheduler is None:
+            return None
+        source = scheduler_source(scheduler)
+        description = json.dumps(
+            [CACHE_VERSION,
+             self._describe(input_file),
+             algorithm_name,
+             hashlib.sha256(source.encode()).hexdigest(),
+             nodes, task_limit, record_jobs])
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """Returns the result stored for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as infile:
+                result = json.load(infile)
+        except (OSError, ValueError):  # missing or damaged
+            return None
+        try:
+            os.utime(path)  # marks it as recently used
+        except FileNotFoundError:  # evicted by another process
+            pass
+        return result
+
+    def put(self, key, result):
+        """Stores the result for a key, evicting old results if needed."""
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory,
+                                            suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w') as outfile:
+                json.dump(result, outfile)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._evict(keep=key + '.json')
+
+    def _evict(self, keep):
+        """Removes the least recently used results until the cache fits
+        in max_bytes. The file named 'keep' is never removed.
+        Other processes may share the directory, so files can vanish
+        at any moment."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:  # evicted by another process
+                    continue
+                entries.append((info.st_mtime_ns, info.st_size, entry))
+                total += info.st_size
+        entries.sort(key=lambda item: item[0])
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name != keep:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:  # evicted by another process
+                    pass
+                total -= size
+
+    def run(self, algorithm_name, nodes, task_limit,
+            input_file='ANL-Intrepid-2009-1.swf',
+            debug=False,
+            record_jobs=False):
+        """Simulates, or returns the stored result of, a configuration.
+
+        The parameters are the same as the ones of Engine.
+
+        Returns
+        -------
+        dict
+            'makespan': makespan of the whole simulation,
+            'statistics': Engine.statistics,
+            'jobs': Engine.job_table (None if record_jobs is False)
+        """
+        key = self.key(algorithm_name, nodes, task_limit, input_file,
+                       record_jobs)
+        result = None if key is None else self.get(key)
+        if result is not None:
+            self.hits += 1
+            if result['jobs'] is not None:
+                result['jobs'] = [tuple(job) for job in result['jobs']]
+            print(f'Found a cached result for {algorithm_name} on' +
+                  f' {nodes} nodes with {input_file}.')
+            print_statistics(result['statistics'])
+            return result
+
+        self.misses += 1
+        simulator = Engine(algorithm_name, nodes, task_limit, input_file,
+                           debug, record_jobs)
+        makespan = simulator.run()
+        result = {'makespan': makespan,
+                  'statistics': simulator.statistics,
+                  'jobs': simulator.job_table}
+        self.put(key, result)
+        return result
@@ -6,12 +6,19 @@ It uses a different scheduling algorithm and a simplified,
 configurable-sized system.
 """
 
+import hashlib
 import heapq
-import math
-from numpy import min, max, mean, median, sum
+import itertools
+import json
+import pickle
+from simulator.budget import Budget, Summary, summarize
 from simulator.job import Job
-from simulator.node import Cluster
+from simulator.node import Cluster, usage_report
 from simulator.event import Event
+from simulator.queue import JobQueue
+from simulator.trace import (Trace, Source, check_submission_order,
+                             merge_sources, submission_order,
+                             with_namespaces)
 from simulator.utils import printable
 import simulator.algorithms as algorithms
 
@@ -22,7 +29,16 @@ class Engine:
     Attributes
     ----------
     debug : bool
-        True if debug messages should be printed
+        True if debug messages should be printed (turned off while a
+        simulation runs with a reduced footprint)
+    requested_debug : bool
+        The debug setting given by the user, restored by reset()
+    sources : list of Source objects
+        Logs replayed by the simulation (never modified)
+    algorithm_name : string
+        Name of the scheduling algorithm
+    task_limit : int
+        Number of tasks to take from the trace (all if <= 0)
     scheduler : function from algorithms
         Scheduler to be used during simulation
     cluster : Cluster object
@@ -30,16 +46,74 @@ class Engine:
     events : heap of events
         Structure organizing events in the simulation
         (start of jobs, end of jobs)
+    submissions : iterator of Job objects
+        Jobs not yet submitted, in submission order. Only the next
+        submission is kept in 'events'.
+    submitted : int
+        Number of jobs taken from 'submissions'
+    queue : JobQueue object
+        Jobs that were submitted but not executed yet
+    wait_times : list or Summary
+        Time spent in the queue by each scheduled job
+    completion_times : list or Summary
+        Predicted completion time of each scheduled job
+    scheduled_jobs : int
+        Number of jobs scheduled so far
     clock : int
         Time in the simulation
+    record_jobs : bool
+        True if run() should keep a table describing every job
+    job_table : list of tuples or None
+        (jobID, submit_time, schedule_time, run_time, nodes) of each
+        scheduled job, filled by run() if record_jobs is True
+    statistics : dict or None
+        Statistics of the last call to run() (see print_statistics)
+    time_budget : float or None
+        Seconds each call to run() may take (None for no limit)
+    memory_budget : int or None
+        Bytes the process may use during run() (None for no limit)
+    state_file : string or None
+        File where run() saves the simulation when it is stopped (None
+        for a name derived from the configuration, see state_name)
+    low_footprint : bool
+        True once the simulation has reduced its footprint
 
+    Notes
+    -----
+    A single input file is read only once into a Trace. Everything a
+    simulation changes (cluster, events, Job objects) is created again
+    by reset(), so the same Engine can run many simulations with
+    rerun().
+
+    Several logs are merged by submit time while the simulation runs,
+    reading each one as a stream: jobs enter memory only when they are
+    about to be submitted.
+
+    With a time or memory budget, run() checks its usage every
+    BUDGET_CHECK_INTERVAL events. Past DEGRADE_FRACTION of a budget,
+    the simulation reduces its footprint: wait and completion times
+    are summarized (the median wait time is then estimated from a
+    sample), job_table is dropped and debug messages stop. Past the
+    budget, run() stops with partial statistics and saves its state
+    to state_file; load_state() followed by run() resumes it. By
+    default, the file is named after the configuration, so simulations
+    of different configurations never overwrite each other's state.
     """
+    # events between two checks of the budget
+    BUDGET_CHECK_INTERVAL = 1000
+    # fraction of a budget after which the footprint is reduced
+    DEGRADE_FRACTION = 0.8
+
     def __init__(self,
                  algorithm_name,
                  nodes,
                  task_limit,
                  input_file='ANL-Intrepid-2009-1.swf',
-                 debug=False):
+                 debug=False,
+                 record_jobs=False,
+                 time_budget=None,
+                 memory_budget=None,
+                 state_file=None):
         """Creates the simulation engine.
 
         Parameters
@@ -50,71 +124,166 @@ class Engine:
             Number of nodes in the cluster
         task_limit : int
             Number of tasks to read from the input file
-        input_file : string [default=ANL-Intrepid-2009-1.swf]
-            Name of the file containing the cluster's log
+        input_file : string or list [default=ANL-Intrepid-2009-1.swf]
+            Name of the file containing the cluster's log, a Trace
+            that was already read, or a Source. A list gives several
+            logs to merge: names in a list are read lazily (so they
+            must be sorted by submit time), and each log in position i
+            of the list gets namespace i unless it is a Source with an
+            explicit namespace. A single log is the same as a list
+            holding it.
         debug : bool [default=False]
             True if debug messages should be printed
+        record_jobs : bool [default=False]
+            True if run() should fill job_table
+        time_budget : float [default=None]
+            Seconds each call to run() may take (None for no limit)
+        memory_budget : int [default=None]
+            Bytes the process may use during run() (None for no limit)
+        state_file : string [default=None]
+            File where run() saves the simulation if it is stopped
+            (None for a name derived from the configuration, see
+            state_name)
+
+        Raises
+        ------
+        ValueError
+            if two input logs share a namespace, or if a log read
+            lazily is not sorted by submit time
         """
         self.debug = debug
+        self.requested_debug = debug
+        self.record_jobs = record_jobs
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.state_file = state_file
+
+        if not isinstance(input_file, list):
+            if not isinstance(input_file, (Trace, Source)):
+                input_file = Trace(input_file)  # read only once
+            input_file = [input_file]
+        self.sources = with_namespaces(input_file)
+        for source in self.sources:
+            if not isinstance(source.trace, Trace):  # read as a stream
+                check_submission_order(source.trace)
+
+        self.reset(algorithm_name, nodes, task_limit)
+
+    def reset(self, algorithm_name=None, nodes=None, task_limit=None):
+        """Prepares a new simulation of the trace.
 
-        try:  # gets the scheduling function identified by its name
-            self.scheduler = getattr(algorithms, algorithm_name)
-            if self.debug:
-                print(f'DEBUG: Set {algorithm_name} as the scheduler.')
-        except AttributeError:
-            print('PANIC! Could not find scheduling algorithm' +
-                  f' {algorithm_name}. Stopping execution.')
-            exit()
+        Parameters
+        ----------
+        algorithm_name : string [default=None]
+            Name of the scheduling algorithm to use (None keeps the
+            current one)
+        nodes : int [default=None]
+            Number of nodes in the cluster (None keeps the current one)
+        task_limit : int [default=None]
+            Number of tasks to take from the trace (None keeps the
+            current one)
+        """
+        # a previous simulation may have turned debug messages off
+        self.debug = self.requested_debug
 
+        if algorithm_name is not None:
+            try:  # gets the scheduling function identified by its name
+                self.scheduler = getattr(algorithms, algorithm_name)
+                self.algorithm_name = algorithm_name
+                if self.debug:
+                    print(f'DEBUG: Set {algorithm_name} as the scheduler.')
+            except AttributeError:
+                print('PANIC! Could not find scheduling algorithm' +
+                      f' {algorithm_name}. Stopping execution.')
+                exit()
+
+        if nodes is None:
+            nodes = self.cluster.total_nodes
         self.cluster = Cluster(nodes)
         if self.debug:
             print(f'DEBUG: Created the cluster with {nodes} nodes.')
 
+        if task_limit is not None:
+            self.task_limit = task_limit
+
         self.events = []
         self.clock = 0
-        num_jobs = 0
-
-        # Reads the input file to populate 'events' and ''jobs'
-        print(f'Reading file {input_file} to populate the simulation')
-        infile = open(input_file, 'r')
+        self.statistics = None
+        self.queue = JobQueue()
+        self.wait_times = []
+        self.completion_times = []
+        self.scheduled_jobs = 0
+        self.job_table = [] if self.record_jobs else None
+        self.low_footprint = False
+        self.submitted = 0
+        self.submissions = self._jobs()
+        self._push_next_submission()
+        print('Ready for simulation of ' +
+              ', '.join(str(source) for source in self.sources) +
+              f' on {self.cluster.total_nodes} nodes.')
 
-        for line in infile:
-            if line[0] == ";":  # skips comments
-                continue
-            parsed = line.split()
-            assert (len(parsed) == 18)
-            # adds an event for this job's submission time
-            submission = int(parsed[1])
-            jobid = int(parsed[0])
-            run = int(parsed[3])
-            required_run = int(parsed[8])
-
-            nproc = int(parsed[7])
-            nodes = math.ceil(float(nproc)/4.0)
-            assert nodes > 0
+    def _fitting(self, records):
+        """Filters out the jobs that cannot run on the cluster."""
+        for record in records:
             # checks if this job can run on the simulated cluster
-            if (nodes > self.cluster.total_nodes):
-                if debug:
-                    print(f'- Skipping job {jobid} as it requires' +
-                          f' {nodes} > {self.cluster.total_nodes}' +
+            if (record.nodes > self.cluster.total_nodes):
+                if self.debug:
+                    print(f'- Skipping job {record.jobID} as it requires' +
+                          f' {record.nodes} > {self.cluster.total_nodes}' +
                           ' nodes.')
                 continue
+            yield record
+
+    def _jobs(self):
+        """Creates the jobs of this simulation from the logs.
+
+        Yields
+        ------
+        Job
+            the jobs that fit in the cluster, in submission order,
+            respecting task_limit
+
+        Notes
+        -----
+        With a single log, task_limit keeps the first jobs in the order
+        of the file, which are then sorted by submission. With several
+        logs, it keeps the first jobs in the merged submission order.
+        """
+        if len(self.sources) == 1 and self.task_limit > 0:
+            records = itertools.islice(
+                self._fitting(self.sources[0].in_file_order()),
+                self.task_limit)
+            records = sorted(records, key=submission_order)
+        else:
+            records = self._fitting(merge_sources(self.sources))
+            if self.task_limit > 0:
+                # respects the limitation on the number of tasks
+                records = itertools.islice(records, self.task_limit)
+
+        for record in records:
+            yield Job(record.jobID, record.submit_time, record.run_time,
+                      record.requested_run_time, record.nodes)
 
-            # creates the job and adds it to the list
-            newjob = Job(jobid, submission, run, required_run, nodes)
-            num_jobs += 1  # another job created
-            heapq.heappush(self.events, (submission, Event(True, newjob)))
+    def _push_next_submission(self):
+        """Adds an event for the next job's submission time, if any."""
+        newjob = next(self.submissions, None)
+        if newjob is not None:
+            self.submitted += 1
+            heapq.heappush(self.events,
+                           (newjob.submit_time, Event(True, newjob)))
 
-            # respects the limitation on the number of tasks
-            if (task_limit > 0) and (num_jobs >= task_limit):
-                break  # we are done adding jobs
+    def rerun(self, algorithm_name=None, nodes=None, task_limit=None):
+        """Resets the engine and simulates the trace again.
 
-        # Closes the file
-        infile.close()
-        print('Finished reading the input file.' +
-              f' {num_jobs} jobs will be scheduled on' +
-              f' {self.cluster.total_nodes}' +
-              ' nodes. Ready for simulation.')
+        The parameters are the same as the ones of reset().
+
+        Returns
+        -------
+        int
+            Makespan of the whole simulation
+        """
+        self.reset(algorithm_name, nodes, task_limit)
+        return self.run()
 
     def run(self):
         """Simulates the scheduling of tasks on a cluster.
@@ -122,21 +291,32 @@ class Engine:
         Returns
         -------
         int
-            Makespan of the whole simulation
+            Makespan of the whole simulation (or the timestamp where
+            it stopped, if it ran out of budget)
         """
 
         print('Starting the simulation.')
-        # list of the jobs that were submitted but not executed yet
-        queue = []
-        # list to keep track of how long the jobs stay in the queue
-        wait_times = []
-        # list to keep track of the completion time of the jobs
-        completion_times = []
-        scheduled_jobs = 0
+        budget = Budget(self.time_budget, self.memory_budget)
+        limited = budget.is_limited()
+        handled_events = 0
+        stopped = False
 
         events = self.events
+        queue = self.queue
         # executes jobs until we run out of them
         while (len(events) > 0) or (len(queue) > 0):
+            # checks the budget once in a while
+            handled_events += 1
+            if limited and (handled_events %
+                            self.BUDGET_CHECK_INTERVAL) == 0:
+                used = budget.used()
+                if used >= 1.0:
+                    stopped = True
+                    break
+                if (used >= self.DEGRADE_FRACTION and
+                        not self.low_footprint):
+                    self.reduce_footprint()
+
             # schedules new jobs while possible
             if len(queue) > 0:  # if there are queued jobs
                 if self.debug:
@@ -169,13 +349,20 @@ class Engine:
                                        (self.clock + job.run_time,
                                         Event(False, job)))
                         # stores the wait time for this job
-                        wait_times.append(job.get_wait_time())
+                        self.wait_times.append(job.get_wait_time())
                         # stores the predicted completion time of this job
-                        completion_times.append(self.clock + job.run_time)
+                        self.completion_times.append(self.clock +
+                                                     job.run_time)
+                        if self.job_table is not None:
+                            self.job_table.append((job.jobID,
+                                                   job.submit_time,
+                                                   job.schedule_time,
+                                                   job.run_time,
+                                                   job.nodes))
                         # counts another scheduled job
-                        scheduled_jobs += 1
-                        if (scheduled_jobs % 1000) == 0:
-                            print(f'- Scheduled the {scheduled_jobs}' +
+                        self.scheduled_jobs += 1
+                        if (self.scheduled_jobs % 1000) == 0:
+                            print(f'- Scheduled the {self.scheduled_jobs}' +
                                   'th job.')
 
             # All jobs that the scheduler deemed ready for execution
@@ -185,6 +372,7 @@ class Engine:
             # checks the event type and acts accordingly
             if newEvent.isNewJob:  # submission of a new job
                 queue.append(newEvent.job_info)  # adds the job to the queue
+                self._push_next_submission()
 
                 if self.debug:
                     print(f'DEBUG: time moved to timestamp {self.clock}.' +
@@ -200,19 +388,171 @@ class Engine:
                           ' The cluster now has' +
                           f' {self.cluster.available_nodes} nodes available.')
 
-        # making sure we emptied the queue too when we finished all events
-        assert (len(queue) == 0)
+        if stopped:
+            path = self.state_file or self.state_name()
+            print(f'Ran out of budget at timestamp {self.clock}.' +
+                  f' Saving the simulation to {path}.')
+            self.save_state(path)
+        else:
+            # making sure we emptied the queue too when we finished
+            # all events
+            assert (len(queue) == 0)
 
         # End of the simulation: print statistics
-        print('Simulation finished.\nStatistics:')
-        print(f'- makespan: {self.clock}')
-        print(f'- total completion time: {sum(completion_times)}')
-        print('- wait times:')
-        print(f'-- min: {min(wait_times)}')
-        print(f'-- max: {max(wait_times)}')
-        print(f'-- mean: {mean(wait_times)}')
-        print(f'-- median: {median(wait_times)}')
-        print(f'-- total (sum): {sum(wait_times)}')
-        print(self.cluster.report_statistics(self.clock))
+        completion = summarize(self.completion_times)
+        self.statistics = {
+            'complete': not stopped,
+            'low_footprint': self.low_footprint,
+            'makespan': self.clock,
+            'jobs': self.scheduled_jobs,
+            'total_completion_time': completion['total'],
+            'wait_times': summarize(self.wait_times),
+            'usage': self.cluster.usage_statistics(self.clock)}
+        print_statistics(self.statistics)
 
         return self.clock
+
+    def reduce_footprint(self):
+        """Keeps the rest of the simulation in (nearly) constant memory.
+
+        Wait and completion times are replaced by Summary objects,
+        job_table is dropped and debug messages are turned off.
+        """
+        print(f'Approaching the budget at timestamp {self.clock}.' +
+              ' Reducing the footprint of the simulation.')
+        self.low_footprint = True
+        self.wait_times = Summary(self.wait_times)
+        self.completion_times = Summary(self.completion_times)
+        self.job_table = None
+        self.debug = False
+
+    def state_name(self):
+        """Returns the default name of the file holding the state of
+        this configuration.
+
+        Returns
+        -------
+        string
+            a name made of the algorithm, the number of nodes, the
+            task limit and a digest of the input logs (see
+            Source.describe)
+        """
+        sources = [source.describe() for source in self.sources]
+        digest = hashlib.sha256(json.dumps(sources).encode()).hexdigest()
+        return (f'simulation_state_{self.algorithm_name}' +
+                f'_{self.cluster.total_nodes}_{self.task_limit}' +
+                f'_{digest[:12]}.pickle')
+
+    def save_state(self, path=None):
+        """Saves the state of the simulation to a file.
+
+        Parameters
+        ----------
+        path : string [default=None]
+            Name of the file to write (None for state_file, or
+            state_name() if state_file is None)
+
+        Notes
+        -----
+        The logs are not saved, only digests of their contents: the
+        simulation is resumed by an Engine created with the same input
+        files (see load_state).
+        """
+        if path is None:
+            path = self.state_file or self.state_name()
+        state = {'sources': [source.describe() for source in self.sources],
+                 'algorithm_name': self.algorithm_name,
+                 'nodes': self.cluster.total_nodes,
+                 'task_limit': self.task_limit,
+                 'clock': self.clock,
+                 'cluster': self.cluster,
+                 'events': self.events,
+                 'queue': self.queue,
+                 'wait_times': self.wait_times,
+                 'completion_times': self.completion_times,
+                 'scheduled_jobs': self.scheduled_jobs,
+                 'job_table': self.job_table,
+                 'low_footprint': self.low_footprint,
+                 'submitted': self.submitted}
+        with open(path, 'wb') as outfile:
+            pickle.dump(state, outfile)
+
+    def load_state(self, path=None):
+        """Loads a simulation saved by save_state(), to resume it with
+        run().
+
+        Parameters
+        ----------
+        path : string [default=None]
+            Name of the file written by save_state() (None for
+            state_file, or state_name() if state_file is None)
+
+        Raises
+        ------
+        ValueError
+            if this Engine does not have the same configuration
+            (algorithm, number of nodes, task limit and input files,
+            with their contents, offsets and namespaces) as the one
+            that saved the simulation
+        """
+        if path is None:
+            path = self.state_file or self.state_name()
+        with open(path, 'rb') as infile:
+            state = pickle.load(infile)
+        sources = [source.describe() for source in self.sources]
+        if state['sources'] != sources:
+            raise ValueError(f'{path} was saved by a simulation of other' +
+                             ' input files. Create the Engine with the' +
+                             ' same input files to resume it.')
+        saved = (state['algorithm_name'], state['nodes'],
+                 state['task_limit'])
+        current = (self.algorithm_name, self.cluster.total_nodes,
+                   self.task_limit)
+        if saved != current:
+            raise ValueError(f'{path} was saved by a simulation of' +
+                             ' (algorithm, nodes, task_limit) =' +
+                             f' {saved}, but this Engine simulates' +
+                             f' {current}.')
+        self.reset()
+        for name in ('clock', 'cluster', 'events', 'queue', 'wait_times',
+                     'completion_times', 'scheduled_jobs', 'job_table',
+                     'low_footprint', 'submitted'):
+            setattr(self, name, state[name])
+        if self.low_footprint:
+            self.debug = False
+        # skips the jobs that were already submitted
+        self.submissions = itertools.islice(self._jobs(), self.submitted,
+                                            None)
+        print(f'Loaded the simulation from {path}, at timestamp' +
+              f' {self.clock} with {self.scheduled_jobs} jobs scheduled.')
+
+
+def print_statistics(statistics):
+    """Prints the statistics of a simulation.
+
+    Parameters
+    ----------
+    statistics : dict
+        whether the simulation is complete, whether it reduced its
+        footprint, number of jobs, makespan, total completion time, wait times
+        (min, max, mean, median and total) and usage of the machine,
+        as stored by Engine.run() in Engine.statistics
+    """
+    wait_times = statistics['wait_times']
+    if statistics['complete']:
+        print('Simulation finished.\nStatistics:')
+    else:
+        print('Simulation stopped before the end.\nPartial statistics:')
+    if statistics['low_footprint']:
+        print('- (the median wait time is estimated from a sample)')
+    print(f'- jobs: {statistics["jobs"]}')
+    print(f'- makespan: {statistics["makespan"]}')
+    print('- total completion time:' +
+          f' {statistics["total_completion_time"]}')
+    print('- wait times:')
+    print(f'-- min: {wait_times["min"]}')
+    print(f'-- max: {wait_times["max"]}')
+    print(f'-- mean: {wait_times["mean"]}')
+    print(f'-- median: {wait_times["median"]}')
+    print(f'-- total (sum): {wait_times["total"]}')
+    print(usage_report(statistics['usage']))
@@ -0,0 +1,166 @@
+"""Lookahead module.
+
+Tools for schedulers that compare several decisions by simulating a
+short time ahead. They work on a Snapshot of the scheduling state,
+which is much cheaper to build and to simulate than a copy of the
+Job and Cluster objects.
+"""
+
+import heapq
+
+
+class Snapshot:
+    """Immutable view of the state seen by a scheduler.
+
+    Attributes
+    ----------
+    clock : int
+        Timestamp of the snapshot
+    available_nodes : int
+        Number of nodes available at that time
+    releases : list of (int, int)
+        (expected_end, nodes) of each running job, sorted by
+        expected_end (Cluster.releases). These are the pending events
+        known to the scheduler.
+    queue : tuple of Job objects
+        The first queued jobs, in arrival order
+
+    Notes
+    -----
+    Only what a scheduler may know is kept: the actual run times of
+    the jobs and the jobs that were not submitted yet are NOT part of
+    the snapshot. Running jobs are expected to end after their
+    requested run time.
+
+    Taking a snapshot copies neither the running jobs nor their
+    releases: the list of releases is shared with the cluster, which
+    keeps it sorted. A snapshot is thus only valid until the cluster
+    changes, that is, during the call to the scheduler that took it.
+    Simulations never modify it (copy on write): the releases of the
+    jobs they start are kept apart, so the same snapshot can be
+    simulated any number of times.
+    """
+    __slots__ = ('clock', 'available_nodes', 'releases', 'queue')
+
+    def __init__(self, jobs, cluster, clock, window=None):
+        """Takes a snapshot of the state given to a scheduler.
+
+        Parameters
+        ----------
+        jobs : list of Job objects
+            Queue of available jobs
+        cluster : Cluster object
+            Cluster containing the nodes required by jobs
+        clock : int
+            Current clock
+        window : int [default=None]
+            Number of jobs from the head of the queue to keep (None
+            keeps all of them)
+        """
+        self.clock = clock
+        self.available_nodes = cluster.available_nodes
+        self.releases = cluster.releases
+        self.queue = tuple(jobs if window is None else jobs[:window])
+
+    def _simulate(self, order, horizon, max_steps):
+        """Simulates an order, releasing at most max_steps jobs.
+
+        Returns
+        -------
+        int or None, int
+            the cost of the order (None if it needed more steps) and
+            the number of steps taken
+        """
+        end = self.clock + horizon
+        clock = self.clock
+        available = self.available_nodes
+        releases = self.releases
+        next_release = 0  # first release of the snapshot not used yet
+        started = []  # heap of the releases of the jobs started here
+        steps = 0
+        cost = 0
+        count = 0
+        for job in order:
+            while available < job.nodes and (next_release < len(releases)
+                                             or started):
+                if steps == max_steps:
+                    return None, steps
+                steps += 1
+                if started and (next_release == len(releases) or
+                                started[0] < releases[next_release]):
+                    release_time, nodes = heapq.heappop(started)
+                else:
+                    release_time, nodes = releases[next_release]
+                    next_release += 1
+                clock = max(clock, release_time)
+                available += nodes
+            if clock > end or available < job.nodes:
+                break
+            cost += clock - job.submit_time
+            heapq.heappush(started,
+                           (clock + job.requested_run_time, job.nodes))
+            available -= job.nodes
+            count += 1
+        for job in order[count:]:
+            cost += end - job.submit_time
+        return cost, steps
+
+    def simulate(self, order, horizon, max_steps=None):
+        """Estimates the wait of the jobs if started in a given order.
+
+        Jobs are started strictly in the given order, each one as soon
+        as enough nodes are released, until the horizon is reached.
+
+        Parameters
+        ----------
+        order : sequence of Job objects
+            Jobs from the snapshot's queue, in the order to start them
+        horizon : int
+            Amount of time to simulate after the snapshot's clock
+        max_steps : int [default=None]
+            Maximum number of job releases to simulate (None for no
+            limit)
+
+        Returns
+        -------
+        int or None
+            Sum of the wait times of the jobs in the order, or None if
+            more than max_steps releases were needed. Jobs that would
+            not start within the horizon count as starting at the
+            horizon.
+        """
+        return self._simulate(order, horizon, max_steps)[0]
+
+    def best_order(self, orders, horizon, max_steps=None):
+        """Chooses the order with the smallest estimated wait.
+
+        Parameters
+        ----------
+        orders : sequence of sequences of Job objects
+            Candidate orders, from the most to the least preferred
+            (the earliest one wins ties)
+        horizon : int
+            Amount of time to simulate for each order
+        max_steps : int [default=None]
+            Maximum number of job releases to simulate for all the
+            orders together (None for no limit). Orders are evaluated
+            in turn until this budget runs out; the ones left are not
+            considered.
+
+        Returns
+        -------
+        sequence of Job objects
+            the best order (the first one if not even it could be
+            simulated within max_steps)
+        """
+        best = orders[0]
+        best_cost = None
+        for order in orders:
+            cost, steps = self._simulate(order, horizon, max_steps)
+            if cost is None:  # out of budget
+                break
+            if max_steps is not None:
+                max_steps -= steps
+            if best_cost is None or cost < best_cost:
+                best, best_cost = order, cost
+        return best
@@ -1,3 +1,6 @@
+import bisect
+
+
 class Cluster:
     """Holds a list of identical nodes. Handles their use.
 
@@ -11,6 +14,9 @@ class Cluster:
         Accumulated seconds-nodes used by jobs.
     running_jobs : dict {Job.jobID, Job}
         List of jobs currently running in the cluster
+    releases : list of (int, int)
+        (expected_end, nodes) of each running job, kept sorted by
+        expected_end as jobs start and finish
 
 
     Notes
@@ -25,6 +31,7 @@ class Cluster:
         self.available_nodes = nodes
         self.used_resources = 0
         self.running_jobs = dict()
+        self.releases = []
 
     def schedule_job(self, job, clock):
         """Schedules a job in the cluster.
@@ -60,6 +67,7 @@ class Cluster:
         job.schedule(clock)
         # Adds jobs to the list of running jobs
         self.running_jobs[job.jobID] = job
+        bisect.insort(self.releases, (job.expected_end, job.nodes))
 
         return True
 
@@ -88,9 +96,11 @@ class Cluster:
         self.used_resources += job.nodes * job.run_time
         # Removes job from the list of running jobs
         del self.running_jobs[job.jobID]
+        release = (job.expected_end, job.nodes)
+        del self.releases[bisect.bisect_left(self.releases, release)]
 
-    def report_statistics(self, makespan):
-        """Reports statistics on the usage of the machine.
+    def usage_statistics(self, makespan):
+        """Computes statistics on the usage of the machine.
         To be called at the end of the simulation.
 
         Parameters
@@ -100,16 +110,59 @@ class Cluster:
 
         Returns
         -------
-        string
-            the statistics as a string, ready to be printed
+        dict
+            used and available node-seconds, idle node-seconds and
+            the idle percentage (None if no time has passed)
         """
         # Calculates how many seconds-nodes we could have used in
         # this makespan, and compares it to how much we actually used
         total_resources = makespan * self.total_nodes
         idle = total_resources - self.used_resources
-        ret = ('Usage of the machine:\n' +
-               f'- {self.used_resources} node-seconds were used,' +
-               f' from {total_resources} available.\n' +
-               f'- Nodes spent {idle} seconds in idle,' +
-               f' or {((idle*100)/total_resources)}%.')
-        return ret
+        if total_resources == 0:  # stopped before the clock moved
+            idle_percent = None
+        else:
+            idle_percent = (idle*100)/total_resources
+        return {'used_resources': self.used_resources,
+                'total_resources': total_resources,
+                'idle': idle,
+                'idle_percent': idle_percent}
+
+    def report_statistics(self, makespan):
+        """Reports statistics on the usage of the machine.
+        To be called at the end of the simulation.
+
+        Parameters
+        ----------
+        makespan : int
+            the total time required to run all the submitted jobs
+
+        Returns
+        -------
+        string
+            the statistics as a string, ready to be printed
+        """
+        return usage_report(self.usage_statistics(makespan))
+
+
+def usage_report(usage):
+    """Formats the statistics from Cluster.usage_statistics().
+
+    Parameters
+    ----------
+    usage : dict
+        the statistics on the usage of the machine
+
+    Returns
+    -------
+    string
+        the statistics as a string, ready to be printed
+    """
+    ret = ('Usage of the machine:\n' +
+           f'- {usage["used_resources"]} node-seconds were used,' +
+           f' from {usage["total_resources"]} available.\n' +
+           f'- Nodes spent {usage["idle"]} seconds in idle')
+    if usage['idle_percent'] is None:
+        ret += '.'
+    else:
+        ret += f', or {usage["idle_percent"]}%.'
+    return ret
@@ -0,0 +1,189 @@
+"""Job queue module.
+
+Holds the queue of jobs waiting to be scheduled, together with a
+vectorized (NumPy) view of its contents.
+"""
+
+import numpy as np
+
+
+class JobQueue(list):
+    """List of queued Job objects that also keeps parallel NumPy arrays.
+
+    The queue behaves like the list of jobs schedulers always received
+    (arrival order, indexing, iteration, len). In addition, each job
+    occupies a slot in a set of parallel arrays, so schedulers can make
+    their choices with array operations (argmin, boolean masks) instead
+    of Python loops over Job objects.
+
+    Attributes
+    ----------
+    nodes : numpy array of int
+        Number of nodes requested by the job in each slot
+    requested_run_time : numpy array of int
+        Amount of time requested by the job in each slot
+    submit_time : numpy array of int
+        Submission timestamp of the job in each slot
+    jobID : numpy array of int
+        Identifier of the job in each slot
+    valid : numpy array of bool
+        True for the slots holding a job that is still in the queue
+
+    Notes
+    -----
+    Slots are given in arrival order, so the valid slots appear in the
+    same order as the jobs in the list. Removed jobs only clear their
+    slot in `valid`; the arrays are compacted from time to time.
+    Entries of invalid slots are meaningless and must be masked out.
+    Use job_at() to go from a slot back to its Job object.
+
+    Jobs can only be added at the end of the queue (append, extend,
+    +=) and removed (remove, pop, del, clear). The operations that
+    would reorder the queue or put a job in the middle of it (insert,
+    sort, reverse, item assignment, *=) raise TypeError, as the slots
+    could no longer follow the order of the list.
+    """
+
+    # initial capacity of the arrays
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        super().__init__()
+        self._slot = dict()  # {Job.jobID: slot}
+        self._size = 0  # number of slots in use (valid or not)
+        self._allocate(self.INITIAL_CAPACITY)
+
+    def _allocate(self, capacity):
+        """(Re)creates the arrays with a given capacity, keeping the
+        contents of the slots in use."""
+        size = self._size
+        old = getattr(self, '_jobs', None)
+        arrays = dict(_nodes=np.int64, _requested_run_time=np.int64,
+                      _submit_time=np.int64, _jobID=np.int64,
+                      _valid=bool, _jobs=object)
+        for name, dtype in arrays.items():
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:size] = getattr(self, name)[:size]
+            setattr(self, name, new)
+
+    def _compact(self):
+        """Drops the invalid slots, keeping arrival order."""
+        keep = self._valid[:self._size].copy()
+        for name in ('_nodes', '_requested_run_time', '_submit_time',
+                     '_jobID', '_valid', '_jobs'):
+            array = getattr(self, name)
+            kept = array[:self._size][keep]
+            array[:len(kept)] = kept
+            empty = None if array.dtype == object else 0
+            array[len(kept):self._size] = empty
+        self._size = int(keep.sum())
+        self._slot = {job.jobID: slot
+                      for slot, job in enumerate(self._jobs[:self._size])}
+
+    def append(self, job):
+        """Adds a job to the end of the queue."""
+        if self._size == len(self._valid):
+            if len(self) <= self._size // 2:
+                self._compact()  # at least half of the slots are free
+            else:
+                self._allocate(2 * len(self._valid))
+        slot = self._size
+        self._nodes[slot] = job.nodes
+        self._requested_run_time[slot] = job.requested_run_time
+        self._submit_time[slot] = job.submit_time
+        self._jobID[slot] = job.jobID
+        self._valid[slot] = True
+        self._jobs[slot] = job
+        self._slot[job.jobID] = slot
+        self._size += 1
+        super().append(job)
+
+    def extend(self, jobs):
+        """Adds jobs to the end of the queue."""
+        for job in jobs:
+            self.append(job)
+
+    def __iadd__(self, jobs):
+        self.extend(jobs)
+        return self
+
+    def _release(self, job):
+        """Frees the slot of a job that left the list."""
+        slot = self._slot.pop(job.jobID)
+        self._valid[slot] = False
+        self._jobs[slot] = None
+
+    def remove(self, job):
+        """Removes a job from the queue."""
+        super().remove(job)
+        self._release(job)
+
+    def pop(self, index=-1):
+        """Removes and returns the job at a position of the queue."""
+        job = super().pop(index)
+        self._release(job)
+        return job
+
+    def __delitem__(self, index):
+        removed = self[index]
+        super().__delitem__(index)
+        for job in (removed if isinstance(index, slice) else [removed]):
+            self._release(job)
+
+    def clear(self):
+        """Removes all jobs from the queue."""
+        super().clear()
+        self._slot.clear()
+        self._valid[:self._size] = False
+        self._jobs[:self._size] = None
+        self._size = 0
+
+    def _reorder(self, *args, **kwargs):
+        raise TypeError('a JobQueue keeps its jobs in arrival order:' +
+                        ' only append, extend, remove, pop, del and' +
+                        ' clear are supported')
+
+    insert = _reorder
+    sort = _reorder
+    reverse = _reorder
+    __setitem__ = _reorder
+    __imul__ = _reorder
+
+    def __reduce__(self):
+        """Pickles the queue as its list of jobs. The arrays are rebuilt
+        when it is loaded."""
+        return (_rebuild_queue, (list(self),))
+
+    def job_at(self, slot):
+        """Returns the Job object stored in a valid slot."""
+        assert self._valid[slot]
+        return self._jobs[slot]
+
+    @property
+    def nodes(self):
+        return self._nodes[:self._size]
+
+    @property
+    def requested_run_time(self):
+        return self._requested_run_time[:self._size]
+
+    @property
+    def submit_time(self):
+        return self._submit_time[:self._size]
+
+    @property
+    def jobID(self):
+        return self._jobID[:self._size]
+
+    @property
+    def valid(self):
+        return self._valid[:self._size]
+
+
+def _rebuild_queue(jobs):
+    """Creates a JobQueue holding the given jobs (used by pickle)."""
+    queue = JobQueue()
+    for job in jobs:
+        queue.append(job)
+    return queue
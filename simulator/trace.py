@@ -0,0 +1,331 @@
+"""Trace module.
+
+Reads clusters' logs (in the Standard Workload Format), either once
+into memory, so the same jobs can be replayed by many simulations, or
+lazily, so several large logs can be merged into one workload.
+"""
+
+import hashlib
+import heapq
+import math
+from collections import namedtuple
+
+TraceRecord = namedtuple('TraceRecord', ['jobID', 'submit_time',
+                                         'run_time', 'requested_run_time',
+                                         'nodes'])
+TraceRecord.__doc__ = """Immutable description of a job from the log.
+
+The fields have the same meaning as the attributes of Job. The
+simulation creates a new Job object from each record it replays.
+"""
+
+# Distance between the job identifiers of two consecutive namespaces
+NAMESPACE_SIZE = 10**9
+
+
+def submission_order(record):
+    """Sorting key giving the order in which jobs are submitted."""
+    return (record.submit_time, record.jobID)
+
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_line(line):
+    """Parses a line of a log.
+
+    Parameters
+    ----------
+    line : string
+        a line in the Standard Workload Format
+
+    Returns
+    -------
+    TraceRecord or None
+        the job in the line, or None if the line is a comment
+    """
+    if line[0] == ";":  # skips comments
+        return None
+    parsed = line.split()
+    assert (len(parsed) == 18)
+    nproc = int(parsed[7])
+    nodes = math.ceil(float(nproc)/4.0)
+    assert nodes > 0
+    return TraceRecord(jobID=int(parsed[0]),
+                       submit_time=int(parsed[1]),
+                       run_time=int(parsed[3]),
+                       requested_run_time=int(parsed[8]),
+                       nodes=nodes)
+
+
+def read_records(input_file):
+    """Reads the jobs of a log one at a time, without keeping them.
+
+    Parameters
+    ----------
+    input_file : string
+        Name of the file containing the cluster's log
+
+    Yields
+    ------
+    TraceRecord
+        the jobs in the order of the file
+    """
+    with open(input_file, 'r') as infile:
+        for line in infile:
+            record = parse_line(line)
+            if record is not None:
+                yield record
+
+
+def unsorted_message(name, record):
+    """Explains that a log cannot be read as a stream."""
+    return (f'{name} is not sorted by submit time (job {record.jobID}' +
+            f' is submitted at {record.submit_time}, before the job' +
+            ' above it). Give the engine a Trace of it instead, which' +
+            ' is sorted in memory.')
+
+
+def check_submission_order(input_file):
+    """Checks that a log can be read as a stream, in constant memory.
+
+    Parameters
+    ----------
+    input_file : string
+        Name of the file containing the cluster's log
+
+    Raises
+    ------
+    ValueError
+        if the jobs of the file are not sorted by submit time
+    """
+    last = None
+    for record in read_records(input_file):
+        if last is not None and record.submit_time < last:
+            raise ValueError(unsorted_message(input_file, record))
+        last = record.submit_time
+
+
+def in_submission_order(records, name):
+    """Orders jobs submitted at the same time by their identifier.
+
+    The simulation handles simultaneous submissions by increasing jobID,
+    so streams must follow that order to be merged. Only the jobs
+    sharing a submit time are held in memory.
+
+    Parameters
+    ----------
+    records : iterable of TraceRecord
+        jobs sorted by submit time
+    name : string
+        Name of the log, for error messages
+
+    Yields
+    ------
+    TraceRecord
+        the jobs sorted by (submit_time, jobID)
+
+    Raises
+    ------
+    ValueError
+        if the jobs are not sorted by submit time
+    """
+    group = []
+    for record in records:
+        if group and record.submit_time != group[0].submit_time:
+            if record.submit_time < group[0].submit_time:
+                raise ValueError(unsorted_message(name, record))
+            group.sort()
+            yield from group
+            group = []
+        group.append(record)
+    group.sort()
+    yield from group
+
+
+class Trace:
+    """Immutable table of the jobs in a cluster's log.
+
+    Attributes
+    ----------
+    input_file : string
+        Name of the file containing the cluster's log
+    records : tuple of TraceRecord
+        Jobs in the order of the file
+    digest : string
+        SHA-256 hex digest of the contents of the file
+
+    Notes
+    -----
+    Nothing in a Trace is changed by the simulation: the mutable
+    information (schedule time, expected end) lives in the Job objects
+    created by Engine for each run.
+    """
+    def __init__(self, input_file='ANL-Intrepid-2009-1.swf'):
+        """Reads the jobs from the input file.
+
+        Parameters
+        ----------
+        input_file : string [default=ANL-Intrepid-2009-1.swf]
+            Name of the file containing the cluster's log
+        """
+        self.input_file = input_file
+        records = []
+        digest = hashlib.sha256()
+
+        print(f'Reading file {input_file} to populate the simulation')
+        with open(input_file, 'rb') as infile:
+            for raw_line in infile:
+                digest.update(raw_line)
+                record = parse_line(raw_line.decode())
+                if record is not None:
+                    records.append(record)
+
+        self.records = tuple(records)
+        self.digest = digest.hexdigest()
+        print(f'Finished reading the input file. {len(self.records)}' +
+              ' jobs were read.')
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __str__(self):
+        return self.input_file
+
+
+class Source:
+    """One of the logs replayed by a simulation.
+
+    Attributes
+    ----------
+    trace : string or Trace
+        Name of the file containing the log (read lazily at each
+        simulation), or a Trace already in memory
+    time_offset : int
+        Amount of time added to the submit time of every job
+    namespace : int or None
+        Job identifiers are shifted by namespace * NAMESPACE_SIZE, so
+        jobs from different logs never share an identifier. None lets
+        the Engine use the position of the log in its list of inputs
+        (see with_namespaces).
+    """
+    def __init__(self, trace, time_offset=0, namespace=None):
+        self.trace = trace
+        self.time_offset = time_offset
+        self.namespace = namespace
+
+    def _shift(self, records):
+        """Applies the offset and the namespace to the jobs."""
+        id_offset = (self.namespace or 0) * NAMESPACE_SIZE
+        for record in records:
+            if self.time_offset == 0 and id_offset == 0:
+                yield record
+            else:
+                yield record._replace(
+                    jobID=record.jobID + id_offset,
+                    submit_time=record.submit_time + self.time_offset)
+
+    def __iter__(self):
+        """Returns the jobs of the log, sorted by (submit_time, jobID),
+        with the offset and namespace applied."""
+        if isinstance(self.trace, Trace):
+            records = sorted(self.trace.records, key=submission_order)
+        else:
+            records = in_submission_order(read_records(self.trace),
+                                          self.trace)
+        return self._shift(records)
+
+    def in_file_order(self):
+        """Returns the jobs of the log in the order of the file, with
+        the offset and namespace applied."""
+        if isinstance(self.trace, Trace):
+            records = self.trace.records
+        else:
+            records = read_records(self.trace)
+        return self._shift(records)
+
+    def describe(self, digest=file_digest):
+        """Describes the jobs this log gives to a simulation.
+
+        Parameters
+        ----------
+        digest : function [default=file_digest]
+            Function hashing the contents of a file, given its name
+
+        Returns
+        -------
+        list
+            digest of the contents of the log, time offset and
+            namespace
+        """
+        if isinstance(self.trace, Trace):
+            contents = self.trace.digest
+        else:
+            contents = digest(self.trace)
+        return [contents, self.time_offset, self.namespace]
+
+    def __str__(self):
+        text = str(self.trace)
+        if self.time_offset != 0:
+            text += f' (+{self.time_offset} s)'
+        return text
+
+
+def with_namespaces(sources):
+    """Gives every log of a list its own namespace.
+
+    Parameters
+    ----------
+    sources : list of Source objects, file names or Traces
+        the logs, in the order given to the Engine
+
+    Returns
+    -------
+    list of Source objects
+        the logs, where names, Traces and Sources without a namespace
+        get their position in the list as namespace (the given Source
+        objects are not modified)
+
+    Raises
+    ------
+    ValueError
+        if two logs share a namespace
+    """
+    resolved = []
+    for i, source in enumerate(sources):
+        if not isinstance(source, Source):
+            source = Source(source, namespace=i)
+        elif source.namespace is None:
+            source = Source(source.trace, source.time_offset, i)
+        resolved.append(source)
+    namespaces = [source.namespace for source in resolved]
+    if len(set(namespaces)) != len(namespaces):
+        raise ValueError('Two logs share a namespace:' +
+                         f' {namespaces}. Their job identifiers' +
+                         ' would collide.')
+    return resolved
+
+
+def merge_sources(sources):
+    """Merges logs lazily by submit time.
+
+    Parameters
+    ----------
+    sources : list of Source objects
+        the logs to merge
+
+    Returns
+    -------
+    iterator of TraceRecord
+        the jobs of all logs, sorted by (submit_time, jobID)
+    """
+    return heapq.merge(*sources, key=submission_order)
@@ -0,0 +1,18 @@
+"""Small traces written on the fly, for tests that must not depend on
+the ANL Intrepid log."""
+
+# jobID, submit time, run time, requested time and processors
+JOBS = [(1, 0, 100, 150, 8),
+        (2, 10, 50, 60, 16),
+        (3, 20, 300, 400, 4),
+        (4, 25, 10, 20, 12)]
+
+
+def write_trace(path, jobs=JOBS):
+    """Writes jobs as a log in the Standard Workload Format."""
+    with open(path, 'w') as outfile:
+        outfile.write('; small trace for tests\n')
+        for jobid, submit, run, requested, procs in jobs:
+            fields = [jobid, submit, 0, run, procs, -1, -1, procs,
+                      requested] + [-1] * 9
+            outfile.write(' '.join(str(field) for field in fields) + '\n')
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.budget import Summary, summarize  # noqa
+from simulator.engine import Engine              # noqa
+from simulator.trace import Trace                # noqa
+from small_trace import JOBS, write_trace        # noqa
+
+
+class BudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.tmp.name, 'trace.swf')
+        write_trace(self.trace)
+        self.state_file = os.path.join(self.tmp.name, 'state.pickle')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def engine(self, **budget):
+        simulator = Engine('fcfs', 4, -1, self.trace, record_jobs=True,
+                           state_file=self.state_file, **budget)
+        simulator.BUDGET_CHECK_INTERVAL = 3
+        return simulator
+
+    def test_stop_and_resume(self):
+        expected = self.engine()
+        expected.run()
+
+        stopped = self.engine(time_budget=1e-9)
+        stopped.run()
+        self.assertFalse(stopped.statistics['complete'])
+        self.assertLess(stopped.statistics['jobs'], len(JOBS))
+        self.assertTrue(os.path.exists(self.state_file))
+
+        resumed = self.engine()
+        resumed.load_state(self.state_file)
+        resumed.run()
+        self.assertEqual(resumed.statistics, expected.statistics)
+        self.assertEqual(resumed.job_table, expected.job_table)
+
+    def test_resume_from_a_trace(self):
+        expected = self.engine()
+        expected.run()
+        self.engine(time_budget=1e-9).run()
+        resumed = Engine('fcfs', 4, -1, Trace(self.trace), record_jobs=True)
+        resumed.load_state(self.state_file)
+        resumed.run()
+        self.assertEqual(resumed.job_table, expected.job_table)
+
+    def test_resume_needs_the_same_inputs(self):
+        self.engine(time_budget=1e-9).run()
+        other = os.path.join(self.tmp.name, 'other.swf')
+        write_trace(other, JOBS[:3])
+        simulator = Engine('fcfs', 4, -1, other)
+        with self.assertRaises(ValueError):
+            simulator.load_state(self.state_file)
+
+    def test_two_stopped_configurations(self):
+        expected = {}
+        for nodes in (4, 5):
+            simulator = Engine('fcfs', nodes, -1, self.trace,
+                               record_jobs=True)
+            simulator.run()
+            expected[nodes] = simulator.job_table
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            names = []
+            for nodes in (4, 5):
+                simulator = Engine('fcfs', nodes, -1, self.trace,
+                                   record_jobs=True, time_budget=1e-9)
+                simulator.BUDGET_CHECK_INTERVAL = 3
+                simulator.run()
+                names.append(simulator.state_name())
+            self.assertNotEqual(names[0], names[1])
+            for name in names:
+                self.assertTrue(os.path.exists(name))
+
+            for nodes in (4, 5):
+                resumed = Engine('fcfs', nodes, -1, self.trace,
+                                 record_jobs=True)
+                resumed.load_state()
+                resumed.run()
+                self.assertEqual(resumed.job_table, expected[nodes])
+
+            for other in (Engine('fcfs', 4, -1, self.trace),
+                          Engine('fcfs', 4, 2, self.trace),
+                          Engine('lookahead', 4, -1, self.trace)):
+                with self.assertRaises(ValueError):
+                    other.load_state(names[1])
+        finally:
+            os.chdir(cwd)
+
+    def test_stop_before_the_clock_moves(self):
+        path = os.path.join(self.tmp.name, 'burst.swf')
+        write_trace(path, [(jobid, 0, 10, 10, 4) for jobid in range(1, 11)])
+        simulator = Engine('fcfs', 1, -1, path, state_file=self.state_file,
+                           time_budget=1e-9)
+        simulator.BUDGET_CHECK_INTERVAL = 3
+        simulator.run()
+        statistics = simulator.statistics
+        self.assertFalse(statistics['complete'])
+        self.assertEqual(statistics['makespan'], 0)
+        self.assertIsNone(statistics['usage']['idle_percent'])
+        self.assertTrue(os.path.exists(self.state_file))
+
+    def test_low_footprint(self):
+        expected = self.engine()
+        expected.run()
+
+        degraded = self.engine(time_budget=1e9)
+        degraded.DEGRADE_FRACTION = 0.0
+        degraded.run()
+        statistics = degraded.statistics
+        self.assertTrue(statistics['complete'])
+        self.assertTrue(statistics['low_footprint'])
+        self.assertIsNone(degraded.job_table)
+        self.assertIsInstance(degraded.wait_times, Summary)
+        for name in ['makespan', 'jobs', 'total_completion_time',
+                     'wait_times']:
+            self.assertEqual(statistics[name], expected.statistics[name])
+
+    def test_rerun_restores_debug(self):
+        degraded = Engine('fcfs', 4, -1, self.trace, debug=True,
+                          time_budget=1e9)
+        degraded.BUDGET_CHECK_INTERVAL = 3
+        degraded.DEGRADE_FRACTION = 0.0
+        degraded.run()
+        self.assertFalse(degraded.debug)
+        degraded.reset()
+        self.assertTrue(degraded.debug)
+        self.assertFalse(degraded.low_footprint)
+
+    def test_summary(self):
+        values = list(range(100000, 0, -7))
+        Summary.SAMPLE_SIZE, size = 1000, Summary.SAMPLE_SIZE
+        try:
+            summary = Summary(values)
+        finally:
+            Summary.SAMPLE_SIZE = size
+        exact = summarize(values)
+        estimated = summarize(summary)
+        for name in ['min', 'max', 'total']:
+            self.assertEqual(estimated[name], exact[name])
+        self.assertAlmostEqual(estimated['mean'], exact['mean'])
+        self.assertLess(abs(estimated['median'] - exact['median']), 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
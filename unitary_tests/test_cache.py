@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.cache import ResultCache, scheduler_source  # noqa
+import simulator.algorithms as algorithms        # noqa
+from simulator.trace import Source, Trace, submission_order  # noqa
+from small_trace import JOBS, write_trace        # noqa
+
+WEIGHT = 2
+
+
+def weighted(jobs, cluster, clock):
+    """Scheduler whose helper and constant are only used in a lambda."""
+    return (True, min(jobs, key=lambda job: submission_order(job)[0] *
+                      WEIGHT))
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.tmp.name, 'trace.swf')
+        write_trace(self.trace, JOBS)
+        self.cache = ResultCache(os.path.join(self.tmp.name, 'cache'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit(self):
+        first = self.cache.run('fcfs', 4, -1, self.trace, record_jobs=True)
+        second = self.cache.run('fcfs', 4, -1, self.trace, record_jobs=True)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(first, second)
+        self.assertEqual(len(second['jobs']), len(JOBS))
+
+    def test_invalidation(self):
+        self.cache.run('fcfs', 4, -1, self.trace)
+        self.cache.run('fcfs', 5, -1, self.trace)
+        self.cache.run('fcfs', 4, 2, self.trace)
+        write_trace(self.trace, JOBS[:3])
+        self.cache.run('fcfs', 4, -1, self.trace)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 4))
+
+    def test_eviction(self):
+        self.cache.max_bytes = 1
+        self.cache.run('fcfs', 4, -1, self.trace)
+        self.cache.run('fcfs', 5, -1, self.trace)
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+        self.cache.run('fcfs', 5, -1, self.trace)
+        self.cache.run('fcfs', 4, -1, self.trace)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 3))
+
+    def test_same_log_same_key(self):
+        key = self.cache.key('fcfs', 4, -1, self.trace)
+        for input_file in [Trace(self.trace), Source(self.trace),
+                           Source(Trace(self.trace)), [self.trace]]:
+            self.assertEqual(self.cache.key('fcfs', 4, -1, input_file), key)
+        self.assertNotEqual(
+            self.cache.key('fcfs', 4, -1, Source(self.trace, namespace=1)),
+            key)
+
+    def test_scheduler_constants_change_the_key(self):
+        key = self.cache.key('lookahead', 4, -1, self.trace)
+        horizon = algorithms.LOOKAHEAD_HORIZON
+        algorithms.LOOKAHEAD_HORIZON = horizon + 1
+        try:
+            self.assertNotEqual(
+                self.cache.key('lookahead', 4, -1, self.trace), key)
+        finally:
+            algorithms.LOOKAHEAD_HORIZON = horizon
+        self.assertEqual(self.cache.key('lookahead', 4, -1, self.trace), key)
+
+    def test_names_in_lambdas_change_the_key(self):
+        global WEIGHT
+        algorithms.weighted = weighted
+        try:
+            key = self.cache.key('weighted', 4, -1, self.trace)
+            WEIGHT = 3
+            self.assertNotEqual(
+                self.cache.key('weighted', 4, -1, self.trace), key)
+        finally:
+            WEIGHT = 2
+            del algorithms.weighted
+        self.assertIn('def submission_order', scheduler_source(weighted))
+
+    def test_failed_put_leaves_no_file(self):
+        with self.assertRaises(TypeError):
+            self.cache.put('broken', {'jobs': object()})
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.algorithms import lookahead       # noqa
+from simulator.engine import Engine              # noqa
+from simulator.job import Job                    # noqa
+from simulator.lookahead import Snapshot         # noqa
+from simulator.node import Cluster               # noqa
+from small_trace import JOBS, write_trace        # noqa
+
+
+class LookaheadTest(unittest.TestCase):
+    def setUp(self):
+        # 3 of the 4 nodes are busy until 100, and we are at 10
+        self.cluster = Cluster(4)
+        self.cluster.schedule_job(Job(1, 0, 500, 100, 3), 0)
+        self.large = Job(2, 5, 50, 50, 2)
+        self.small = Job(3, 8, 10, 10, 1)
+        self.queue = [self.large, self.small]
+
+    def test_simulate(self):
+        snapshot = Snapshot(self.queue, self.cluster, 10)
+        self.assertEqual(snapshot.simulate([self.large, self.small], 1000),
+                         95 + 92)
+        self.assertEqual(snapshot.simulate([self.small, self.large], 1000),
+                         2 + 95)
+        self.assertEqual(snapshot.simulate([self.large, self.small], 50),
+                         55 + 52)
+        # the snapshot does not change with simulations
+        self.assertEqual(snapshot.releases, [(100, 3)])
+        self.assertEqual(snapshot.available_nodes, 1)
+
+    def test_step_budget(self):
+        snapshot = Snapshot(self.queue, self.cluster, 10)
+        # the large job needs the release at 100, the small one does not
+        self.assertIsNone(snapshot.simulate([self.large, self.small],
+                                            1000, max_steps=0))
+        self.assertIsNone(snapshot.simulate([self.small, self.large],
+                                            1000, max_steps=1))
+        self.assertEqual(snapshot.simulate([self.small, self.large],
+                                           1000, max_steps=2), 2 + 95)
+        orders = [[self.large, self.small], [self.small, self.large]]
+        self.assertIs(snapshot.best_order(orders, 1000), orders[1])
+        self.assertIs(snapshot.best_order(orders, 1000, 3), orders[1])
+        # with one step, only the first order can be simulated
+        self.assertIs(snapshot.best_order(orders, 1000, 1), orders[0])
+        self.assertIs(snapshot.best_order(orders, 1000, 0), orders[0])
+
+    def test_cluster_keeps_releases_sorted(self):
+        self.cluster = Cluster(8)
+        self.cluster.schedule_job(Job(1, 0, 500, 100, 3), 0)
+        jobs = [Job(2, 0, 10, 300, 1), Job(3, 0, 10, 200, 1),
+                Job(4, 0, 10, 100, 1)]
+        for job in jobs:
+            self.cluster.schedule_job(job, 0)
+        self.assertEqual(self.cluster.releases,
+                         [(100, 1), (100, 3), (200, 1), (300, 1)])
+        self.cluster.finish_job(jobs[1], 10)
+        self.cluster.finish_job(self.cluster.running_jobs[1], 10)
+        self.assertEqual(self.cluster.releases, [(100, 1), (300, 1)])
+
+    def test_decision(self):
+        self.assertEqual(lookahead(self.queue, self.cluster, 10),
+                         (True, self.small))
+        self.assertEqual(lookahead([self.large], self.cluster, 10),
+                         (False, None))
+
+    def test_simulation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.swf')
+            write_trace(path)
+            simulator = Engine('lookahead', 4, -1, path, record_jobs=True)
+            simulator.run()
+        self.assertEqual(len(simulator.job_table), len(JOBS))
+        self.assertEqual(simulator.cluster.releases, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
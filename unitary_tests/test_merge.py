@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.engine import Engine              # noqa
+from simulator.trace import NAMESPACE_SIZE, Source, Trace  # noqa
+from small_trace import JOBS, write_trace        # noqa
+
+# jobs from a second machine, with identifiers that collide with JOBS
+OTHER_JOBS = [(1, 5, 70, 80, 4),
+              (2, 10, 20, 30, 8),
+              (3, 40, 60, 60, 12)]
+
+
+class MergeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.tmp.name, 'first.swf')
+        self.second = os.path.join(self.tmp.name, 'second.swf')
+        write_trace(self.first, JOBS)
+        write_trace(self.second, OTHER_JOBS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_engine(self, input_file, task_limit=-1):
+        simulator = Engine('fcfs', 5, task_limit, input_file,
+                           record_jobs=True)
+        simulator.run()
+        return simulator
+
+    def test_merge_matches_combined_file(self):
+        # the same workload written as a single sorted file
+        offset = 100
+        combined = [(NAMESPACE_SIZE + jobid, submit + offset, run,
+                     requested, procs)
+                    for jobid, submit, run, requested, procs in OTHER_JOBS]
+        combined = sorted(JOBS + combined, key=lambda job: (job[1], job[0]))
+        path = os.path.join(self.tmp.name, 'combined.swf')
+        write_trace(path, combined)
+
+        expected = self.run_engine(path)
+        for second in [self.second, Trace(self.second)]:
+            merged = self.run_engine(
+                [self.first, Source(second, time_offset=offset, namespace=1)])
+            self.assertEqual(merged.statistics, expected.statistics)
+            self.assertEqual(merged.job_table, expected.job_table)
+
+    def test_namespaces(self):
+        merged = self.run_engine([self.first, self.second])
+        ids = sorted(job[0] for job in merged.job_table)
+        self.assertEqual(ids, [1, 2, 3, 4] + [NAMESPACE_SIZE + jobid
+                                              for jobid in (1, 2, 3)])
+
+    def test_sources_without_namespace(self):
+        merged = self.run_engine([Source(self.first),
+                                  Source(self.first, time_offset=1)])
+        ids = sorted(job[0] for job in merged.job_table)
+        self.assertEqual(ids, [1, 2, 3, 4] + [NAMESPACE_SIZE + jobid
+                                              for jobid in (1, 2, 3, 4)])
+
+    def test_shared_namespace(self):
+        with self.assertRaises(ValueError):
+            Engine('fcfs', 5, -1, [Source(self.first, namespace=1),
+                                   Source(self.second, namespace=1)])
+
+    def test_single_log_forms(self):
+        expected = [[Trace(self.first).digest, 0, 0]]
+        for input_file in [self.first, Trace(self.first),
+                           Source(self.first), [self.first]]:
+            simulator = Engine('fcfs', 5, -1, input_file)
+            self.assertEqual([source.describe()
+                              for source in simulator.sources], expected)
+
+    def test_unsorted_stream(self):
+        path = os.path.join(self.tmp.name, 'unsorted.swf')
+        write_trace(path, JOBS[::-1])
+        with self.assertRaisesRegex(ValueError, 'unsorted.swf'):
+            Engine('fcfs', 5, -1, [self.first, path])
+        # in memory, the log is sorted
+        merged = self.run_engine([self.first, Trace(path)])
+        self.assertEqual(len(merged.job_table), 2 * len(JOBS))
+
+    def test_task_limit_on_unsorted_file(self):
+        # a single log keeps its first jobs in the order of the file
+        path = os.path.join(self.tmp.name, 'unsorted.swf')
+        write_trace(path, JOBS[::-1])
+        simulator = self.run_engine(path, task_limit=2)
+        ids = sorted(job[0] for job in simulator.job_table)
+        self.assertEqual(ids, [3, 4])
+
+    def test_task_limit(self):
+        merged = self.run_engine([self.first, self.second], task_limit=3)
+        submits = sorted(job[1] for job in merged.job_table)
+        self.assertEqual(submits, [0, 5, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
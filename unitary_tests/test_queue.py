@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+import numpy as np
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import simulator.algorithms as algorithms       # noqa
+from simulator.engine import Engine              # noqa
+from simulator.job import Job                    # noqa
+from simulator.queue import JobQueue             # noqa
+from small_trace import write_trace              # noqa
+
+
+def largest_fit(jobs, cluster, clock):
+    """Schedules the queued job requesting the most nodes among the
+    ones that fit, as in the example of the algorithms module."""
+    fits = jobs.valid & (jobs.nodes <= cluster.available_nodes)
+    if fits.any():
+        slot = np.argmax(np.where(fits, jobs.nodes, -1))
+        return (True, jobs.job_at(slot))
+    return (False, None)
+
+
+class JobQueueTest(unittest.TestCase):
+    def valid_jobs(self, queue):
+        return [queue.job_at(slot)
+                for slot in queue.valid.nonzero()[0]]
+
+    def test_arrays_follow_the_list(self):
+        queue = JobQueue()
+        jobs = [Job(i, 10 * i, 5, 100 - i, i % 7 + 1) for i in range(200)]
+        for job in jobs:
+            queue.append(job)
+        for job in jobs[::3]:
+            queue.remove(job)
+        self.assertEqual(self.valid_jobs(queue), list(queue))
+        mask = queue.valid
+        self.assertEqual(list(queue.jobID[mask]),
+                         [job.jobID for job in queue])
+        self.assertEqual(list(queue.requested_run_time[mask]),
+                         [job.requested_run_time for job in queue])
+
+    def test_compaction_keeps_arrival_order(self):
+        queue = JobQueue()
+        for i in range(1000):
+            queue.append(Job(i, i, 5, 5, 1))
+            if i % 4 != 3:
+                queue.remove(queue[0])
+        self.assertEqual(len(queue), 250)
+        self.assertLess(len(queue.valid), 1000)
+        self.assertEqual(self.valid_jobs(queue), list(queue))
+
+    def test_clear(self):
+        queue = JobQueue()
+        queue.append(Job(1, 0, 5, 5, 1))
+        queue.clear()
+        self.assertEqual(len(queue.valid), 0)
+        queue.append(Job(2, 0, 5, 5, 1))
+        self.assertEqual(self.valid_jobs(queue), list(queue))
+
+    def test_other_removals(self):
+        queue = JobQueue()
+        queue.extend(Job(i, i, 5, 5, 1) for i in range(10))
+        queue += [Job(10, 10, 5, 5, 1)]
+        self.assertEqual(queue.pop().jobID, 10)
+        self.assertEqual(queue.pop(0).jobID, 0)
+        del queue[2]
+        del queue[4:6]
+        self.assertEqual([job.jobID for job in queue], [1, 2, 4, 5, 8, 9])
+        self.assertEqual(self.valid_jobs(queue), list(queue))
+
+    def test_reordering_is_refused(self):
+        queue = JobQueue()
+        queue.extend([Job(1, 0, 5, 5, 1), Job(2, 0, 5, 5, 1)])
+        job = Job(3, 0, 5, 5, 1)
+        for operation in (lambda: queue.insert(0, job),
+                          lambda: queue.sort(),
+                          lambda: queue.reverse(),
+                          lambda: queue.__setitem__(0, job),
+                          lambda: queue.__imul__(2)):
+            self.assertRaises(TypeError, operation)
+        self.assertEqual(self.valid_jobs(queue), list(queue))
+
+    def test_vectorized_scheduler(self):
+        # 2 nodes, busy with job 1 until 100. Then job 3 (2 nodes) is
+        # chosen before the earlier job 2 (1 node), and the tie between
+        # jobs 2 and 4 goes to the earliest one
+        jobs = [(1, 0, 100, 100, 8),
+                (2, 10, 50, 50, 4),
+                (3, 20, 50, 50, 8),
+                (4, 20, 10, 10, 4)]
+        algorithms.largest_fit = largest_fit
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'trace.swf')
+                write_trace(path, jobs)
+                simulator = Engine('largest_fit', 2, -1, path,
+                                   record_jobs=True)
+                simulator.run()
+        finally:
+            del algorithms.largest_fit
+        starts = {jobid: start for jobid, _, start, _, _
+                  in simulator.job_table}
+        self.assertEqual(starts, {1: 0, 3: 100, 2: 150, 4: 150})
+
+
+if __name__ == '__main__':
+    unittest.main()
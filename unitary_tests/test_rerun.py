@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.cache import file_digest          # noqa
+from simulator.engine import Engine              # noqa
+from simulator.trace import Trace                # noqa
+from small_trace import write_trace              # noqa
+
+
+class RerunTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'trace.swf')
+        write_trace(self.path)
+        self.trace = Trace(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_trace_is_not_modified(self):
+        records = list(self.trace)
+        Engine('fcfs', 4, -1, self.trace).run()
+        self.assertEqual(list(self.trace), records)
+        self.assertEqual(self.trace.digest, file_digest(self.path))
+
+    def test_rerun_matches_new_engines(self):
+        simulator = Engine('fcfs', 4, -1, self.trace)
+        simulator.run()
+        for nodes, task_limit in [(3, -1), (5, 2), (4, -1)]:
+            makespan = simulator.rerun(nodes=nodes, task_limit=task_limit)
+            fresh = Engine('fcfs', nodes, task_limit, self.path)
+            self.assertEqual(makespan, fresh.run())
+            self.assertEqual(simulator.statistics, fresh.statistics)
+
+
+if __name__ == '__main__':
+    unittest.main()